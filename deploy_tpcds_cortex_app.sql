@@ -33,7 +33,7 @@ GRANT USAGE ON STREAMLIT tpcds_cortex_search_app TO ROLE PUBLIC;
 -- =============================================================================
 
 SELECT '✅ TPCDS CORTEX SEARCH APP DEPLOYED!' as status,
-       'Upload tpcds_cortex_search_app.py with same packages as cortex_search_app.py' as instructions;
+       'Upload tpcds_cortex_search_app.py with the cortex_search_app.py packages plus orjson' as instructions;
 
 /*
 📋 DEPLOYMENT INSTRUCTIONS (Following Working Pattern):
@@ -53,15 +53,17 @@ This new app follows the EXACT same pattern as your working cortex_search_app.py
    - Upload the file: tpcds_cortex_search_app.py
    - Set it as the main file
 
-2. **Required Packages (SAME AS cortex_search_app.py):**
-   Since your cortex_search_app.py works perfectly, use the SAME packages:
+2. **Required Packages (cortex_search_app.py packages PLUS orjson):**
+   Start from your cortex_search_app.py package configuration and make sure it has:
    - pandas
    - plotly  
    - numpy
    - streamlit
+   - pyarrow (CSV export and Arrow-backed columns; also used by cortex_search_app.py)
+   - orjson (JSON export and filter cache keys; the app will not import without it)
    - snowflake (if needed)
    
-   Use whatever package configuration you have for cortex_search_app.py!
+   See requirements.txt for the minimum versions.
 
 3. **App Features (Identical Structure):**
    ✅ Multi-dimensional search across TPCDS products, demographics, geography
@@ -104,7 +106,7 @@ This new app follows the EXACT same pattern as your working cortex_search_app.py
    - Export options
 
 🔧 **TROUBLESHOOTING:**
-✅ Uses same imports as your working cortex_search_app.py
+✅ Uses same imports as your working cortex_search_app.py, plus orjson (add it if the app fails to import)
 ✅ Same Python API approach (snowflake.core.Root)
 ✅ Same function structure and error handling
 ✅ Same performance optimization patterns
@@ -117,7 +119,7 @@ This new app follows the EXACT same pattern as your working cortex_search_app.py
 
 🎯 **Why This Should Work:**
 - Follows EXACT same pattern as your working cortex_search_app.py
-- Uses same imports and package dependencies
+- Uses same imports and package dependencies (plus orjson)
 - Same API calls and error handling
 - Only differences are the database/schema/service names and data fields
 
@@ -128,5 +130,5 @@ SELECT
     'TPCDS Cortex Search App' as application_name,
     'Following cortex_search_app.py Pattern' as approach,
     'Same structure, imports, and UI as working app' as benefits,
-    'Upload tpcds_cortex_search_app.py with same packages' as next_action;
+    'Upload tpcds_cortex_search_app.py with same packages plus orjson' as next_action;
 